@@ -3,7 +3,7 @@ import time
 from abc import abstractmethod
 from collections.abc import Generator
 from enum import Enum
-from typing import Any
+from typing import Any, Optional
 
 from sqlalchemy.orm import DeclarativeMeta
 
@@ -12,8 +12,10 @@ from core.app.entities.app_invoke_entities import InvokeFrom
 from core.app.entities.queue_entities import (
     AppQueueEvent,
     QueueErrorEvent,
+    QueueMessage,
     QueuePingEvent,
     QueueStopEvent,
+    QueueTextChunkEvent,
 )
 from extensions.ext_redis import redis_client
 
@@ -38,7 +40,7 @@ class AppQueueManager:
         redis_client.setex(AppQueueManager._generate_task_belong_cache_key(self._task_id), 1800,
                            f"{user_prefix}-{self._user_id}")
 
-        q = queue.Queue()
+        q = queue.SimpleQueue()
 
         self._q = q
 
@@ -54,10 +56,22 @@ class AppQueueManager:
         while True:
             try:
                 message = self._q.get(timeout=1)
-                if message is None:
-                    break
 
-                yield message
+                # drain messages that have already arrived, so that the stop and ping checks below
+                # run once per batch instead of once per message
+                messages = [message]
+                while message is not None:
+                    try:
+                        message = self._q.get_nowait()
+                    except queue.Empty:
+                        break
+                    messages.append(message)
+
+                for message in self._merge_text_chunk_messages(messages):
+                    if message is None:
+                        return
+
+                    yield message
             except queue.Empty:
                 continue
             finally:
@@ -74,6 +88,41 @@ class AppQueueManager:
                     self.publish(QueuePingEvent(), PublishFrom.TASK_PIPELINE)
                     last_ping_time = elapsed_time // 10
 
+    @classmethod
+    def _merge_text_chunk_messages(cls, messages: list[Optional[QueueMessage]]) -> list[Optional[QueueMessage]]:
+        """
+        Merge consecutive text chunk messages with the same metadata into one message,
+        so that a burst of streamed chunks is handled and sent to the client at once
+        :param messages: queue messages
+        :return:
+        """
+        message_groups: list[list[Optional[QueueMessage]]] = []
+        for message in messages:
+            if (message_groups
+                    and cls._is_text_chunk_message(message)
+                    and cls._is_text_chunk_message(message_groups[-1][0])
+                    and message.event.metadata == message_groups[-1][0].event.metadata):
+                message_groups[-1].append(message)
+            else:
+                message_groups.append([message])
+
+        merged_messages = []
+        for message_group in message_groups:
+            message = message_group[0]
+            if len(message_group) > 1:
+                event = message.event.model_copy(update={
+                    'text': ''.join(chunk_message.event.text for chunk_message in message_group)
+                })
+                message = message.model_copy(update={'event': event})
+
+            merged_messages.append(message)
+
+        return merged_messages
+
+    @classmethod
+    def _is_text_chunk_message(cls, message: Optional[QueueMessage]) -> bool:
+        return message is not None and isinstance(message.event, QueueTextChunkEvent)
+
     def stop_listen(self) -> None:
         """
         Stop listen to queue
@@ -1,7 +1,10 @@
 import enum
+import sys
+from collections import defaultdict
+from collections.abc import Sequence
 from typing import Any, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr, field_validator
 
 from core.file.tool_file_parser import ToolFileParser
 from core.file.upload_file_parser import UploadFileParser
@@ -19,12 +22,15 @@ class FileExtraConfig(BaseModel):
 class FileType(enum.Enum):
     IMAGE = 'image'
 
-    @staticmethod
-    def value_of(value):
-        for member in FileType:
-            if member.value == value:
-                return member
-        raise ValueError(f"No matching enum found for value '{value}'")
+    @classmethod
+    def value_of(cls, value):
+        """Wraps cls(value), which new code should prefer; kept only for its legacy error message."""
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(value)
+        except ValueError:
+            raise ValueError(f"No matching enum found for value '{value}'")
 
 
 class FileTransferMethod(enum.Enum):
@@ -32,23 +38,29 @@ class FileTransferMethod(enum.Enum):
     LOCAL_FILE = 'local_file'
     TOOL_FILE = 'tool_file'
 
-    @staticmethod
-    def value_of(value):
-        for member in FileTransferMethod:
-            if member.value == value:
-                return member
-        raise ValueError(f"No matching enum found for value '{value}'")
+    @classmethod
+    def value_of(cls, value):
+        """Wraps cls(value), which new code should prefer; kept only for its legacy error message."""
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(value)
+        except ValueError:
+            raise ValueError(f"No matching enum found for value '{value}'")
 
 class FileBelongsTo(enum.Enum):
     USER = 'user'
     ASSISTANT = 'assistant'
 
-    @staticmethod
-    def value_of(value):
-        for member in FileBelongsTo:
-            if member.value == value:
-                return member
-        raise ValueError(f"No matching enum found for value '{value}'")
+    @classmethod
+    def value_of(cls, value):
+        """Wraps cls(value), which new code should prefer; kept only for its legacy error message."""
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(value)
+        except ValueError:
+            raise ValueError(f"No matching enum found for value '{value}'")
 
 
 class FileVar(BaseModel):
@@ -63,6 +75,64 @@ class FileVar(BaseModel):
     extension: Optional[str] = None
     mime_type: Optional[str] = None
 
+    _upload_file: Optional[Any] = PrivateAttr(default=None)
+    _upload_file_loaded: bool = PrivateAttr(default=False)
+    _image_data: Optional[str] = PrivateAttr(default=None)
+
+    @field_validator('extension', 'mime_type')
+    def intern_short_string(cls, v):
+        # extensions and mime types repeat across files, share one string object for each value
+        if isinstance(v, str) and len(v) < 64:
+            return sys.intern(v)
+        return v
+
+    @classmethod
+    def from_trusted(cls, **fields) -> 'FileVar':
+        """
+        Build file var from data the app has already validated, like message file records,
+        without running pydantic validation again.
+        Only use it for trusted internal data, never for user inputs.
+        :param fields: file var fields
+        :return:
+        """
+        fields['type'] = FileType.value_of(fields['type'])
+        fields['transfer_method'] = FileTransferMethod.value_of(fields['transfer_method'])
+        return cls.model_construct(**fields)
+
+    @classmethod
+    def prefetch_upload_files(cls, files: Sequence['FileVar']) -> None:
+        """
+        Load upload files of local file vars in one query per tenant,
+        so that resolving their data afterwards won't query them one by one
+        :param files: file vars
+        :return:
+        """
+        from models.model import UploadFile
+        pending_files: dict[str, dict[str, list[FileVar]]] = defaultdict(lambda: defaultdict(list))
+        for file in files:
+            if (file.type is FileType.IMAGE
+                    and file.transfer_method is FileTransferMethod.LOCAL_FILE
+                    and file.related_id
+                    and not file._upload_file_loaded):
+                pending_files[file.tenant_id][file.related_id].append(file)
+
+        for tenant_id, files_by_related_id in pending_files.items():
+            upload_files = (db.session.query(UploadFile)
+                            .filter(
+                UploadFile.tenant_id == tenant_id,
+                UploadFile.id.in_(list(files_by_related_id.keys()))
+            ).all())
+
+            upload_files_by_id = {}
+            for upload_file in upload_files:
+                db.session.expunge(upload_file)
+                upload_files_by_id[upload_file.id] = upload_file
+
+            for related_id, file_vars in files_by_related_id.items():
+                for file_var in file_vars:
+                    file_var._upload_file = upload_files_by_id.get(related_id)
+                    file_var._upload_file_loaded = True
+
     def to_dict(self) -> dict:
         return {
             '__variant': self.__class__.__name__,
@@ -83,7 +153,7 @@ class FileVar(BaseModel):
         :return:
         """
         preview_url = self.preview_url
-        if self.type == FileType.IMAGE:
+        if self.type is FileType.IMAGE:
             text = f'![{self.filename or ""}]({preview_url})'
         else:
             text = f'[{self.filename or preview_url}]({preview_url})'
@@ -109,34 +179,59 @@ class FileVar(BaseModel):
 
     @property
     def prompt_message_content(self) -> ImagePromptMessageContent:
-        if self.type == FileType.IMAGE:
-            image_config = self.extra_config.image_config
+        if self.type is FileType.IMAGE:
+            image_config = self.extra_config.image_config if self.extra_config else None
+            detail = image_config.get("detail") if image_config else None
 
             return ImagePromptMessageContent(
                 data=self.data,
                 detail=ImagePromptMessageContent.DETAIL.HIGH
-                if image_config.get("detail") == "high" else ImagePromptMessageContent.DETAIL.LOW
+                if detail == "high" else ImagePromptMessageContent.DETAIL.LOW
             )
 
     def _get_data(self, force_url: bool = False) -> Optional[str]:
-        from models.model import UploadFile
-        if self.type == FileType.IMAGE:
-            if self.transfer_method == FileTransferMethod.REMOTE_URL:
+        if self.type is FileType.IMAGE:
+            if self.transfer_method is FileTransferMethod.REMOTE_URL:
                 return self.url
-            elif self.transfer_method == FileTransferMethod.LOCAL_FILE:
-                upload_file = (db.session.query(UploadFile)
-                               .filter(
-                    UploadFile.id == self.related_id,
-                    UploadFile.tenant_id == self.tenant_id
-                ).first())
-
-                return UploadFileParser.get_image_data(
-                    upload_file=upload_file,
+            elif self.transfer_method is FileTransferMethod.LOCAL_FILE:
+                if not force_url and self._image_data is not None:
+                    return self._image_data
+
+                data = UploadFileParser.get_image_data(
+                    upload_file=self._get_upload_file(),
                     force_url=force_url
                 )
-            elif self.transfer_method == FileTransferMethod.TOOL_FILE:
+
+                # base64 data won't expire like signed urls, only load it from storage once
+                if not force_url and data and data.startswith('data:'):
+                    self._image_data = data
+
+                return data
+            elif self.transfer_method is FileTransferMethod.TOOL_FILE:
                 extension = self.extension
                 # add sign url
                 return ToolFileParser.get_tool_file_manager().sign_file(tool_file_id=self.related_id, extension=extension)
 
         return None
+
+    def _get_upload_file(self):
+        """
+        Get upload file of local file, only query it once per file var
+        :return:
+        """
+        if not self._upload_file_loaded:
+            from models.model import UploadFile
+            upload_file = (db.session.query(UploadFile)
+                           .filter(
+                UploadFile.id == self.related_id,
+                UploadFile.tenant_id == self.tenant_id
+            ).first())
+
+            if upload_file:
+                # detach it so that later commits in the session won't expire the loaded attributes
+                db.session.expunge(upload_file)
+
+            self._upload_file = upload_file
+            self._upload_file_loaded = True
+
+        return self._upload_file
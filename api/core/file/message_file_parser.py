@@ -31,18 +31,21 @@ class MessageFileParser:
         for file in files:
             if not isinstance(file, dict):
                 raise ValueError('Invalid file format, must be dict')
-            if not file.get('type'):
+            file_type = file.get('type')
+            if not file_type:
                 raise ValueError('Missing file type')
-            FileType.value_of(file.get('type'))
-            if not file.get('transfer_method'):
+            FileType.value_of(file_type)
+            transfer_method = file.get('transfer_method')
+            if not transfer_method:
                 raise ValueError('Missing file transfer method')
-            FileTransferMethod.value_of(file.get('transfer_method'))
-            if file.get('transfer_method') == FileTransferMethod.REMOTE_URL.value:
-                if not file.get('url'):
+            FileTransferMethod.value_of(transfer_method)
+            if transfer_method == FileTransferMethod.REMOTE_URL.value:
+                url = file.get('url')
+                if not url:
                     raise ValueError('Missing file url')
-                if not file.get('url').startswith('http'):
+                if not url.startswith('http'):
                     raise ValueError('Invalid file url')
-            if file.get('transfer_method') == FileTransferMethod.LOCAL_FILE.value and not file.get('upload_file_id'):
+            if transfer_method == FileTransferMethod.LOCAL_FILE.value and not file.get('upload_file_id'):
                 raise ValueError('Missing file upload_file_id')
             if file.get('transform_method') == FileTransferMethod.TOOL_FILE.value and not file.get('tool_file_id'):
                 raise ValueError('Missing file tool_file_id')
@@ -65,6 +68,7 @@ class MessageFileParser:
                 if len(files) > image_config['number_limits']:
                     raise ValueError(f"Number of image files exceeds the maximum limit {image_config['number_limits']}")
 
+                user_role = 'account' if isinstance(user, Account) else 'end_user'
                 for file_obj in file_objs:
                     # Validate transfer method
                     if file_obj.transfer_method.value not in image_config['transfer_methods']:
@@ -86,7 +90,7 @@ class MessageFileParser:
                             UploadFile.id == file_obj.related_id,
                             UploadFile.tenant_id == self.tenant_id,
                             UploadFile.created_by == user.id,
-                            UploadFile.created_by_role == ('account' if isinstance(user, Account) else 'end_user'),
+                            UploadFile.created_by_role == user_role,
                             UploadFile.extension.in_(IMAGE_EXTENSIONS)
                         ).first())
 
@@ -109,9 +113,13 @@ class MessageFileParser:
         """
         # transform files to file objs
         type_file_objs = self._to_file_objs(files, file_extra_config)
+        file_objs = [file_obj for file_objs in type_file_objs.values() for file_obj in file_objs]
+
+        # load upload files of all file objs at once
+        FileVar.prefetch_upload_files(file_objs)
 
         # return all file objs
-        return [file_obj for file_objs in type_file_objs.values() for file_obj in file_objs]
+        return file_objs
 
     def _to_file_objs(self, files: list[Union[dict, MessageFile]],
                       file_extra_config: FileExtraConfig) -> dict[FileType, list[FileVar]]:
@@ -171,11 +179,11 @@ class MessageFileParser:
                 extra_config=file_extra_config
             )
         else:
-            return FileVar(
+            return FileVar.from_trusted(
                 id=file.id,
                 tenant_id=self.tenant_id,
-                type=FileType.value_of(file.type),
-                transfer_method=FileTransferMethod.value_of(file.transfer_method),
+                type=file.type,
+                transfer_method=file.transfer_method,
                 url=file.url,
                 related_id=file.upload_file_id or None,
                 extra_config=file_extra_config
@@ -39,10 +39,10 @@ class NodeType(Enum):
         :param value: node type value
         :return: node type
         """
-        for node_type in cls:
-            if node_type.value == value:
-                return node_type
-        raise ValueError(f'invalid node type value {value}')
+        try:
+            return cls(value)
+        except ValueError:
+            raise ValueError(f'invalid node type value {value}')
 
 
 class NodeRunMetadataKey(Enum):
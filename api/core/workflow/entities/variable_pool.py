@@ -1,5 +1,5 @@
 from collections import defaultdict
-from collections.abc import Mapping, Sequence
+from collections.abc import Iterable, Mapping, Sequence
 from typing import Any, Union
 
 from typing_extensions import deprecated
@@ -67,19 +67,35 @@ class VariablePool:
         Returns:
             None
         """
-        if len(selector) < 2:
-            raise ValueError("Invalid selector")
+        self.add_many(((selector, value),))
 
-        if value is None:
-            return
+    def add_many(self, items: Iterable[tuple[Sequence[str], Any]], /) -> None:
+        """
+        Adds multiple variables to the variable pool.
 
-        if isinstance(value, Segment):
-            v = value
-        else:
-            v = factory.build_segment(value)
+        Args:
+            items (Iterable[tuple[Sequence[str], Any]]): Pairs of selector and value, added in order.
 
-        hash_key = hash(tuple(selector[1:]))
-        self._variable_dictionary[selector[0]][hash_key] = v
+        Raises:
+            ValueError: If a selector is invalid.
+
+        Returns:
+            None
+        """
+        variable_dictionary = self._variable_dictionary
+        for selector, value in items:
+            if len(selector) < 2:
+                raise ValueError("Invalid selector")
+
+            if value is None:
+                continue
+
+            if isinstance(value, Segment):
+                v = value
+            else:
+                v = factory.build_segment(value)
+
+            variable_dictionary[selector[0]][hash(tuple(selector[1:]))] = v
 
     def get(self, selector: Sequence[str], /) -> Segment | None:
         """
@@ -1,7 +1,5 @@
 from typing import Optional
 
-from pydantic import BaseModel
-
 from core.app.entities.app_invoke_entities import InvokeFrom
 from core.workflow.entities.base_node_data_entities import BaseIterationState
 from core.workflow.entities.node_entities import NodeRunResult
@@ -37,11 +35,8 @@ class WorkflowRunState:
 
     workflow_nodes_and_results: list[WorkflowNodeAndResult]
 
-    class NodeRun(BaseModel):
-        node_id: str
-        iteration_node_id: str
-
-    workflow_node_runs: list[NodeRun]
+    # ran node id -> iteration node id, for nodes ran in the current iteration
+    workflow_node_runs: dict[str, str]
     workflow_node_steps: int
 
     current_iteration_state: Optional[BaseIterationState]
@@ -70,4 +65,4 @@ class WorkflowRunState:
 
         self.current_iteration_state = None
         self.workflow_node_steps = 1
-        self.workflow_node_runs = []
\ No newline at end of file
+        self.workflow_node_runs = {}
\ No newline at end of file
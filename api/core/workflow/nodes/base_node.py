@@ -112,15 +112,17 @@ class BaseNode(ABC):
         :return:
         """
         if self.callbacks:
+            # callbacks only read the metadata, so one dict is shared by all of them
+            metadata = {
+                "node_type": self.node_type,
+                "is_answer_previous_node": self.is_answer_previous_node,
+                "value_selector": value_selector
+            }
             for callback in self.callbacks:
                 callback.on_node_text_chunk(
                     node_id=self.node_id,
                     text=text,
-                    metadata={
-                        "node_type": self.node_type,
-                        "is_answer_previous_node": self.is_answer_previous_node,
-                        "value_selector": value_selector
-                    }
+                    metadata=metadata
                 )
 
     @classmethod
@@ -148,7 +148,6 @@ class IfElseNode(BaseNode):
 
             if condition.value is not None:
                 variable_template_parser = VariableTemplateParser(template=condition.value)
-                expected_value = variable_template_parser.extract_variable_selectors()
                 variable_selectors = variable_template_parser.extract_variable_selectors()
                 if variable_selectors:
                     for variable_selector in variable_selectors:
@@ -1,13 +1,14 @@
 import json
 from collections.abc import Generator
 from copy import deepcopy
-from typing import TYPE_CHECKING, Optional, cast
+from typing import Optional, cast
 
 from core.app.entities.app_invoke_entities import ModelConfigWithCredentialsEntity
 from core.app.entities.queue_entities import QueueRetrieverResourcesEvent
 from core.entities.model_entities import ModelStatus
 from core.entities.provider_entities import QuotaUnit
 from core.errors.error import ModelCurrentlyNotSupportError, ProviderTokenNotInitError, QuotaExceededError
+from core.file.file_obj import FileVar
 from core.memory.token_buffer_memory import TokenBufferMemory
 from core.model_manager import ModelInstance, ModelManager
 from core.model_runtime.entities.llm_entities import LLMUsage
@@ -38,10 +39,6 @@ from models.model import Conversation
 from models.provider import Provider, ProviderType
 from models.workflow import WorkflowNodeExecutionStatus
 
-if TYPE_CHECKING:
-    from core.file.file_obj import FileVar
-
-
 
 class LLMNode(BaseNode):
     _node_data_cls = LLMNodeData
@@ -77,6 +74,7 @@ class LLMNode(BaseNode):
             files = self._fetch_files(node_data, variable_pool)
 
             if files:
+                FileVar.prefetch_upload_files(files)
                 node_inputs['#files#'] = [file.to_dict() for file in files]
 
             # fetch context value
@@ -332,7 +330,7 @@ class LLMNode(BaseNode):
 
         return inputs
 
-    def _fetch_files(self, node_data: LLMNodeData, variable_pool: VariablePool) -> list["FileVar"]:
+    def _fetch_files(self, node_data: LLMNodeData, variable_pool: VariablePool) -> list[FileVar]:
         """
         Fetch files
         :param node_data: node data
@@ -533,7 +531,7 @@ class LLMNode(BaseNode):
                                query: Optional[str],
                                query_prompt_template: Optional[str],
                                inputs: dict[str, str],
-                               files: list["FileVar"],
+                               files: list[FileVar],
                                context: Optional[str],
                                memory: Optional[TokenBufferMemory],
                                model_config: ModelConfigWithCredentialsEntity) \
@@ -174,6 +174,14 @@ class WorkflowEngineManager:
         graph = workflow.graph_dict
 
         try:
+            # index node configs by node id, so that each step looks its next node up directly
+            node_configs = {node_config.get('id'): node_config for node_config in graph.get('nodes', [])}
+
+            # index outgoing edges by source node id, keeping the edge order of the graph
+            edge_mapping: dict[str, list[Mapping[str, Any]]] = {}
+            for edge in graph.get('edges', []):
+                edge_mapping.setdefault(edge.get('source'), []).append(edge)
+
             answer_prov_node_ids = []
             for node in graph.get('nodes', []):
                 if node.get('id', '') == 'answer':
@@ -192,11 +200,18 @@ class WorkflowEngineManager:
             has_entry_node = False
             max_execution_steps = dify_config.WORKFLOW_MAX_EXECUTION_STEPS
             max_execution_time = dify_config.WORKFLOW_MAX_EXECUTION_TIME
+
+            # release the connection checked out by the caller before the first node runs,
+            # each node closes the session again once it has finished
+            db.session.close()
+
             while True:
                 # get next node, multiple target nodes in the future
                 next_node = self._get_next_overall_node(
                     workflow_run_state=workflow_run_state,
                     graph=graph,
+                    node_configs=node_configs,
+                    edge_mapping=edge_mapping,
                     predecessor_node=predecessor_node,
                     callbacks=callbacks,
                     start_at=start_at,
@@ -237,6 +252,8 @@ class WorkflowEngineManager:
                             next_node = self._get_next_overall_node(
                                 workflow_run_state=workflow_run_state,
                                 graph=graph,
+                                node_configs=node_configs,
+                                edge_mapping=edge_mapping,
                                 predecessor_node=current_iteration_node,
                                 callbacks=callbacks,
                                 start_at=start_at,
@@ -249,7 +266,10 @@ class WorkflowEngineManager:
                             # move to next iteration
                             next_node_id = next_iteration
                             # get next id
-                            next_node = self._get_node(workflow_run_state=workflow_run_state, graph=graph, node_id=next_node_id, callbacks=callbacks)
+                            next_node = self._get_node(workflow_run_state=workflow_run_state,
+                                                       node_configs=node_configs,
+                                                       node_id=next_node_id,
+                                                       callbacks=callbacks)
 
                 if not next_node:
                     break
@@ -309,7 +329,10 @@ class WorkflowEngineManager:
                         workflow_run_state.current_iteration_state = None
                         continue
                     else:
-                        next_node = self._get_node(workflow_run_state=workflow_run_state, graph=graph, node_id=next_node_id, callbacks=callbacks)
+                        next_node = self._get_node(workflow_run_state=workflow_run_state,
+                                                   node_configs=node_configs,
+                                                   node_id=next_node_id,
+                                                   callbacks=callbacks)
 
                 if next_node and next_node.node_id in answer_prov_node_ids:
                     next_node.is_answer_previous_node = True
@@ -322,7 +345,7 @@ class WorkflowEngineManager:
                     callbacks=callbacks
                 )
 
-                if next_node.node_type in [NodeType.END]:
+                if next_node.node_type is NodeType.END:
                     break
 
                 predecessor_node = next_node
@@ -636,10 +659,10 @@ class WorkflowEngineManager:
                         output=workflow_run_state.current_iteration_state.get_current_output()
                     )
         # clear ran nodes
-        workflow_run_state.workflow_node_runs = [
-            node_run for node_run in workflow_run_state.workflow_node_runs
-            if node_run.iteration_node_id != current_iteration_node.node_id
-        ]
+        workflow_run_state.workflow_node_runs = {
+            node_id: iteration_node_id for node_id, iteration_node_id in workflow_run_state.workflow_node_runs.items()
+            if iteration_node_id != current_iteration_node.node_id
+        }
 
         # clear variables in current iteration
         nodes = graph.get('nodes')
@@ -665,6 +688,8 @@ class WorkflowEngineManager:
 
     def _get_next_overall_node(self, *, workflow_run_state: WorkflowRunState,
                        graph: Mapping[str, Any],
+                       node_configs: Mapping[str, Mapping[str, Any]],
+                       edge_mapping: Mapping[str, Sequence[Mapping[str, Any]]],
                        predecessor_node: Optional[BaseNode] = None,
                        callbacks: Sequence[WorkflowCallback],
                        start_at: Optional[str] = None,
@@ -673,6 +698,8 @@ class WorkflowEngineManager:
         Get next node
         multiple target nodes in the future.
         :param graph: workflow graph
+        :param node_configs: node configs of workflow graph by node id
+        :param edge_mapping: outgoing edges of workflow graph by source node id
         :param predecessor_node: predecessor node
         :param callbacks: workflow callbacks
         :return:
@@ -704,11 +731,8 @@ class WorkflowEngineManager:
                     )
 
         else:
-            edges = graph.get('edges')
-            source_node_id = predecessor_node.node_id
-
             # fetch all outgoing edges from source node
-            outgoing_edges = [edge for edge in edges if edge.get('source') == source_node_id]
+            outgoing_edges = edge_mapping.get(predecessor_node.node_id)
             if not outgoing_edges:
                 return None
 
@@ -733,12 +757,7 @@ class WorkflowEngineManager:
                 return None
 
             # fetch target node from target node id
-            target_node_config = None
-            for node in nodes:
-                if node.get('id') == target_node_id:
-                    target_node_config = node
-                    break
-
+            target_node_config = node_configs.get(target_node_id)
             if not target_node_config:
                 return None
 
@@ -758,31 +777,29 @@ class WorkflowEngineManager:
             )
 
     def _get_node(self, workflow_run_state: WorkflowRunState,
-                  graph: Mapping[str, Any],
+                  node_configs: Mapping[str, Mapping[str, Any]],
                   node_id: str,
                   callbacks: Sequence[WorkflowCallback]):
         """
         Get node from graph by node id
         """
-        nodes = graph.get('nodes')
-        if not nodes:
+        node_config = node_configs.get(node_id)
+        if not node_config:
             return None
 
-        for node_config in nodes:
-            if node_config.get('id') == node_id:
-                node_type = NodeType.value_of(node_config.get('data', {}).get('type'))
-                node_cls = node_classes[node_type]
-                return node_cls(
-                    tenant_id=workflow_run_state.tenant_id,
-                    app_id=workflow_run_state.app_id,
-                    workflow_id=workflow_run_state.workflow_id,
-                    user_id=workflow_run_state.user_id,
-                    user_from=workflow_run_state.user_from,
-                    invoke_from=workflow_run_state.invoke_from,
-                    config=node_config,
-                    callbacks=callbacks,
-                    workflow_call_depth=workflow_run_state.workflow_call_depth
-                )
+        node_type = NodeType.value_of(node_config.get('data', {}).get('type'))
+        node_cls = node_classes[node_type]
+        return node_cls(
+            tenant_id=workflow_run_state.tenant_id,
+            app_id=workflow_run_state.app_id,
+            workflow_id=workflow_run_state.workflow_id,
+            user_id=workflow_run_state.user_id,
+            user_from=workflow_run_state.user_from,
+            invoke_from=workflow_run_state.invoke_from,
+            config=node_config,
+            callbacks=callbacks,
+            workflow_call_depth=workflow_run_state.workflow_call_depth
+        )
 
     def _is_timed_out(self, start_at: float, max_execution_time: int) -> bool:
         """
@@ -797,10 +814,7 @@ class WorkflowEngineManager:
         """
         Check node has ran
         """
-        return bool([
-            node_and_result for node_and_result in workflow_run_state.workflow_node_runs
-            if node_and_result.node_id == node_id
-        ])
+        return node_id in workflow_run_state.workflow_node_runs
 
     def _run_workflow_node(self, *, workflow_run_state: WorkflowRunState,
                            node: BaseNode,
@@ -816,8 +830,6 @@ class WorkflowEngineManager:
                     predecessor_node_id=predecessor_node.node_id if predecessor_node else None
                 )
 
-        db.session.close()
-
         workflow_nodes_and_result = WorkflowNodeAndResult(
             node=node,
             result=None
@@ -831,10 +843,8 @@ class WorkflowEngineManager:
 
         # mark node as running
         if workflow_run_state.current_iteration_state:
-            workflow_run_state.workflow_node_runs.append(WorkflowRunState.NodeRun(
-                node_id=node.node_id,
-                iteration_node_id=workflow_run_state.current_iteration_state.iteration_node_id
-            ))
+            workflow_run_state.workflow_node_runs[node.node_id] = \
+                workflow_run_state.current_iteration_state.iteration_node_id
 
         try:
             # run node, result must have inputs, process_data, outputs, execution_metadata
@@ -847,7 +857,7 @@ class WorkflowEngineManager:
                 error='Workflow stopped.'
             )
         except Exception as e:
-            logger.exception(f"Node {node.node_data.title} run failed: {str(e)}")
+            logger.exception("Node %s run failed", node.node_data.title)
             node_run_result = NodeRunResult(
                 status=WorkflowNodeExecutionStatus.FAILED,
                 error=str(e)
@@ -872,7 +882,8 @@ class WorkflowEngineManager:
         if node.is_answer_previous_node and not isinstance(node, LLMNode):
             if not node_run_result.metadata:
                 node_run_result.metadata = {}
-            node_run_result.metadata["is_answer_previous_node"]=True
+            node_run_result.metadata["is_answer_previous_node"] = True
+        metadata = node_run_result.metadata
         workflow_nodes_and_result.result = node_run_result
 
         # node run success
@@ -885,7 +896,7 @@ class WorkflowEngineManager:
                     inputs=node_run_result.inputs,
                     process_data=node_run_result.process_data,
                     outputs=node_run_result.outputs,
-                    execution_metadata=node_run_result.metadata
+                    execution_metadata=metadata
                 )
 
         if node_run_result.outputs:
@@ -898,8 +909,9 @@ class WorkflowEngineManager:
                     variable_value=variable_value
                 )
 
-        if node_run_result.metadata and node_run_result.metadata.get(NodeRunMetadataKey.TOTAL_TOKENS):
-            workflow_run_state.total_tokens += int(node_run_result.metadata.get(NodeRunMetadataKey.TOTAL_TOKENS))
+        total_tokens = metadata.get(NodeRunMetadataKey.TOTAL_TOKENS) if metadata else None
+        if total_tokens:
+            workflow_run_state.total_tokens += int(total_tokens)
 
         db.session.close()
 
@@ -908,28 +920,26 @@ class WorkflowEngineManager:
                                       variable_key_list: list[str],
                                       variable_value: VariableValue):
         """
-        Append variables recursively
+        Append a variable and, for dict values, every nested item under its extended selector.
+        Nested dicts are walked with an explicit stack rather than recursion.
         :param variable_pool: variable pool
         :param node_id: node id
         :param variable_key_list: variable key list
         :param variable_value: variable value
-        :return:
+        :return: None, all collected variables are written with a single variable_pool.add_many call
         """
-        variable_pool.add(
-            [node_id] + variable_key_list, variable_value
-        )
+        variables = []
+        pending_variables = [((node_id, *variable_key_list), variable_value)]
+        while pending_variables:
+            selector, value = pending_variables.pop()
+            variables.append((selector, value))
 
-        # if variable_value is a dict, then recursively append variables
-        if isinstance(variable_value, dict):
-            for key, value in variable_value.items():
-                # construct new key list
-                new_key_list = variable_key_list + [key]
-                self._append_variables_recursively(
-                    variable_pool=variable_pool,
-                    node_id=node_id,
-                    variable_key_list=new_key_list,
-                    variable_value=value
-                )
+            # if value is a dict, then append its items as well
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    pending_variables.append(((*selector, key), item))
+
+        variable_pool.add_many(variables)
 
     @classmethod
     def handle_special_values(cls, value: Optional[dict]) -> Optional[dict]:
@@ -947,6 +957,7 @@ class WorkflowEngineManager:
                 if isinstance(val, FileVar):
                     new_value[key] = val.to_dict()
                 elif isinstance(val, list):
+                    FileVar.prefetch_upload_files([v for v in val if isinstance(v, FileVar)])
                     new_val = []
                     for v in val:
                         if isinstance(v, FileVar):
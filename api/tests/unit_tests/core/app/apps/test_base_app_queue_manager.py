@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock, patch
+
+from core.app.apps.base_app_queue_manager import PublishFrom
+from core.app.apps.workflow.app_queue_manager import WorkflowAppQueueManager
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.app.entities.queue_entities import QueueTextChunkEvent, QueueWorkflowSucceededEvent
+
+
+@patch('core.app.apps.base_app_queue_manager.redis_client')
+def test_listen_drains_queued_messages(mock_redis_client: MagicMock):
+    mock_redis_client.get.return_value = None
+    queue_manager = WorkflowAppQueueManager(
+        task_id='task-id',
+        user_id='user-id',
+        invoke_from=InvokeFrom.SERVICE_API,
+        app_mode='workflow'
+    )
+
+    for text in ['a', 'b', 'c']:
+        queue_manager.publish(QueueTextChunkEvent(text=text, metadata={'node_id': 'llm'}), PublishFrom.TASK_PIPELINE)
+    queue_manager.publish(QueueTextChunkEvent(text='d', metadata={'node_id': 'answer'}), PublishFrom.TASK_PIPELINE)
+    queue_manager.publish(QueueWorkflowSucceededEvent(), PublishFrom.TASK_PIPELINE)
+
+    mock_redis_client.get.reset_mock()
+    events = [message.event for message in queue_manager.listen()]
+
+    # consecutive chunks with the same metadata are merged
+    assert len(events) == 3
+    assert events[0].text == 'abc'
+    assert events[0].metadata == {'node_id': 'llm'}
+    assert events[1].text == 'd'
+    assert isinstance(events[2], QueueWorkflowSucceededEvent)
+    # stop flag is checked once for the whole batch
+    mock_redis_client.get.assert_called_once()
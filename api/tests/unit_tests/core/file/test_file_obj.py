@@ -0,0 +1,156 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.file.file_obj import FileExtraConfig, FileTransferMethod, FileType, FileVar
+from core.file.upload_file_parser import UploadFileParser
+from core.model_runtime.entities.message_entities import ImagePromptMessageContent
+
+
+def test_value_of():
+    assert FileType.value_of('image') == FileType.IMAGE
+    assert FileTransferMethod.value_of('local_file') == FileTransferMethod.LOCAL_FILE
+    assert FileTransferMethod.value_of(FileTransferMethod.TOOL_FILE) == FileTransferMethod.TOOL_FILE
+
+    with pytest.raises(ValueError, match="No matching enum found for value 'video'"):
+        FileType.value_of('video')
+
+
+def test_local_file_upload_file_queried_once():
+    upload_file = MagicMock(id='upload-file-id', extension='png')
+    mock_db = MagicMock()
+    mock_db.session.query.return_value.filter.return_value.first.return_value = upload_file
+
+    file = FileVar(
+        tenant_id='tenant-id',
+        type=FileType.IMAGE,
+        transfer_method=FileTransferMethod.LOCAL_FILE,
+        related_id='upload-file-id',
+    )
+
+    with (
+        patch('core.file.file_obj.db', mock_db),
+        patch.object(UploadFileParser, 'get_signed_temp_image_url', return_value='https://example.com/image.png'),
+    ):
+        assert file.preview_url
+        assert file.to_dict()['url']
+        assert file.to_markdown()
+
+    mock_db.session.query.assert_called_once()
+
+
+def test_prefetch_upload_files():
+    upload_files = [MagicMock(id='upload-file-1', extension='png'), MagicMock(id='upload-file-2', extension='jpg')]
+    mock_db = MagicMock()
+    mock_db.session.query.return_value.filter.return_value.all.return_value = upload_files
+
+    files = [
+        FileVar(
+            tenant_id='tenant-id',
+            type=FileType.IMAGE,
+            transfer_method=FileTransferMethod.LOCAL_FILE,
+            related_id=related_id,
+        )
+        for related_id in ('upload-file-1', 'upload-file-2', 'upload-file-3')
+    ]
+    files.append(FileVar(
+        tenant_id='tenant-id',
+        type=FileType.IMAGE,
+        transfer_method=FileTransferMethod.REMOTE_URL,
+        url='https://example.com/image.png',
+    ))
+
+    with (
+        patch('core.file.file_obj.db', mock_db),
+        patch.object(UploadFileParser, 'get_signed_temp_image_url', return_value='https://example.com/image.png'),
+    ):
+        FileVar.prefetch_upload_files(files)
+        assert [file.preview_url for file in files] == [
+            'https://example.com/image.png',
+            'https://example.com/image.png',
+            None,
+            'https://example.com/image.png',
+        ]
+
+    mock_db.session.query.assert_called_once()
+
+
+def test_prompt_message_content_detail():
+    file = FileVar(
+        tenant_id='tenant-id',
+        type=FileType.IMAGE,
+        transfer_method=FileTransferMethod.REMOTE_URL,
+        url='https://example.com/image.png',
+        extra_config=FileExtraConfig(image_config={'detail': 'high'}),
+    )
+    content = file.prompt_message_content
+    assert content.data == 'https://example.com/image.png'
+    assert content.detail == ImagePromptMessageContent.DETAIL.HIGH
+
+    file.extra_config = FileExtraConfig(image_config=None)
+    assert file.prompt_message_content.detail == ImagePromptMessageContent.DETAIL.LOW
+
+    file.extra_config = None
+    assert file.prompt_message_content.detail == ImagePromptMessageContent.DETAIL.LOW
+
+
+def test_from_trusted():
+    extra_config = FileExtraConfig(image_config={'detail': 'low'})
+    file = FileVar.from_trusted(
+        id='message-file-id',
+        tenant_id='tenant-id',
+        type='image',
+        transfer_method='remote_url',
+        url='https://example.com/image.png',
+        related_id=None,
+        extra_config=extra_config,
+    )
+
+    assert file.type is FileType.IMAGE
+    assert file.transfer_method is FileTransferMethod.REMOTE_URL
+    assert file.extra_config is extra_config
+    assert file.filename is None
+    assert file.preview_url == 'https://example.com/image.png'
+    assert file.to_dict()['type'] == 'image'
+
+
+def test_local_file_base64_data_loaded_once():
+    upload_file = MagicMock(id='upload-file-id', extension='png', key='upload-file-key', mime_type='image/png')
+    mock_db = MagicMock()
+    mock_db.session.query.return_value.filter.return_value.first.return_value = upload_file
+    mock_storage = MagicMock()
+    mock_storage.load.return_value = b'image'
+
+    file = FileVar(
+        tenant_id='tenant-id',
+        type=FileType.IMAGE,
+        transfer_method=FileTransferMethod.LOCAL_FILE,
+        related_id='upload-file-id',
+    )
+
+    with (
+        patch('core.file.file_obj.db', mock_db),
+        patch('core.file.upload_file_parser.storage', mock_storage),
+        patch('core.file.upload_file_parser.dify_config', MagicMock(MULTIMODAL_SEND_IMAGE_FORMAT='base64')),
+    ):
+        assert file.data == 'data:image/png;base64,aW1hZ2U='
+        assert file.data == 'data:image/png;base64,aW1hZ2U='
+
+    mock_storage.load.assert_called_once_with('upload-file-key')
+
+
+def test_extension_and_mime_type_interned():
+    files = [
+        FileVar(
+            tenant_id='tenant-id',
+            type=FileType.IMAGE,
+            transfer_method=FileTransferMethod.TOOL_FILE,
+            related_id='tool-file-id',
+            extension=''.join(['.', 'png']),
+            mime_type=''.join(['image/', 'png']),
+        )
+        for _ in range(2)
+    ]
+
+    assert files[0].extension is files[1].extension
+    assert files[0].mime_type is files[1].mime_type
@@ -0,0 +1,25 @@
+import pytest
+
+from core.app.segments import StringSegment
+from core.workflow.entities.variable_pool import VariablePool
+
+
+def test_add_many():
+    pool = VariablePool(system_variables={}, user_inputs={}, environment_variables=[])
+
+    pool.add_many([
+        (('node', 'text'), 'hello'),
+        (('node', 'obj', 'count'), 2),
+        (('node', 'segment'), StringSegment(value='segment')),
+        (('node', 'none'), None),
+        (('other', 'text'), 'world'),
+    ])
+
+    assert pool.get(['node', 'text']).to_object() == 'hello'
+    assert pool.get(['node', 'obj', 'count']).to_object() == 2
+    assert pool.get(['node', 'segment']).to_object() == 'segment'
+    assert pool.get(['node', 'none']) is None
+    assert pool.get(['other', 'text']).to_object() == 'world'
+
+    with pytest.raises(ValueError, match='Invalid selector'):
+        pool.add_many([(('node',), 'value')])
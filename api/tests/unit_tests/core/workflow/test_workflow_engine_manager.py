@@ -0,0 +1,157 @@
+from unittest.mock import MagicMock
+
+from core.app.entities.app_invoke_entities import InvokeFrom
+from core.workflow.entities.variable_pool import VariablePool
+from core.workflow.nodes.base_node import UserFrom
+from core.workflow.workflow_engine_manager import WorkflowEngineManager
+from extensions.ext_database import db
+
+
+def test_append_variables_recursively():
+    pool = VariablePool(system_variables={}, user_inputs={}, environment_variables=[])
+
+    WorkflowEngineManager()._append_variables_recursively(
+        variable_pool=pool,
+        node_id='code',
+        variable_key_list=['result'],
+        variable_value={'a': {'b': {'c': 'deep'}}, 'd': 1},
+    )
+
+    assert pool.get(['code', 'result']).to_object() == {'a': {'b': {'c': 'deep'}}, 'd': 1}
+    assert pool.get(['code', 'result', 'a']).to_object() == {'b': {'c': 'deep'}}
+    assert pool.get(['code', 'result', 'a', 'b', 'c']).to_object() == 'deep'
+    assert pool.get(['code', 'result', 'd']).to_object() == 1
+
+
+def test_run_workflow_follows_branch():
+    graph = {
+        'nodes': [
+            {'id': 'start', 'data': {'title': 'Start', 'type': 'start', 'variables': []}},
+            {
+                'id': 'if-else',
+                'data': {
+                    'title': 'IF/ELSE',
+                    'type': 'if-else',
+                    'logical_operator': 'and',
+                    'conditions': [
+                        {'comparison_operator': 'is', 'variable_selector': ['start', 'query'], 'value': 'yes'},
+                    ],
+                },
+            },
+            {'id': 'end-true', 'data': {'title': 'End True', 'type': 'end', 'outputs': []}},
+            {'id': 'end-false', 'data': {'title': 'End False', 'type': 'end', 'outputs': []}},
+        ],
+        'edges': [
+            {'source': 'start', 'target': 'if-else'},
+            {'source': 'if-else', 'sourceHandle': 'false', 'target': 'end-false'},
+            {'source': 'if-else', 'sourceHandle': 'true', 'target': 'end-true'},
+        ],
+    }
+    workflow = MagicMock(id='1', tenant_id='1', app_id='1', type='workflow', graph_dict=graph)
+    callback = MagicMock()
+    pool = VariablePool(system_variables={}, user_inputs={'query': 'yes'}, environment_variables=[])
+
+    # Mock db.session.close()
+    db.session.close = MagicMock()
+
+    WorkflowEngineManager().run_workflow(
+        workflow=workflow,
+        user_id='1',
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        callbacks=[callback],
+        variable_pool=pool,
+    )
+
+    callback.on_workflow_run_succeeded.assert_called_once()
+    succeeded_node_ids = [
+        call.kwargs['node_id'] for call in callback.on_workflow_node_execute_succeeded.call_args_list
+    ]
+    assert succeeded_node_ids == ['start', 'if-else', 'end-true']
+
+
+def test_run_workflow_with_iteration():
+    graph = {
+        'nodes': [
+            {'id': 'start', 'data': {'title': 'Start', 'type': 'start', 'variables': []}},
+            {
+                'id': 'iteration',
+                'data': {
+                    'title': 'Iteration',
+                    'type': 'iteration',
+                    'start_node_id': 'aggregator',
+                    'iterator_selector': ['start', 'items'],
+                    'output_selector': ['aggregator', 'output'],
+                },
+            },
+            {
+                'id': 'aggregator',
+                'data': {
+                    'title': 'Aggregator',
+                    'type': 'variable-aggregator',
+                    'iteration_id': 'iteration',
+                    'output_type': 'string',
+                    'variables': [['iteration', 'item']],
+                },
+            },
+            {
+                'id': 'end',
+                'data': {
+                    'title': 'End',
+                    'type': 'end',
+                    'outputs': [{'variable': 'result', 'value_selector': ['iteration', 'output']}],
+                },
+            },
+        ],
+        'edges': [
+            {'source': 'start', 'target': 'iteration'},
+            {'source': 'iteration', 'target': 'end'},
+        ],
+    }
+    workflow = MagicMock(id='1', tenant_id='1', app_id='1', type='workflow', graph_dict=graph)
+    callback = MagicMock()
+    pool = VariablePool(system_variables={}, user_inputs={'items': ['a', 'b', 'c']}, environment_variables=[])
+
+    # Mock db.session.close()
+    db.session.close = MagicMock()
+
+    WorkflowEngineManager().run_workflow(
+        workflow=workflow,
+        user_id='1',
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        callbacks=[callback],
+        variable_pool=pool,
+    )
+
+    callback.on_workflow_run_succeeded.assert_called_once()
+    succeeded_calls = callback.on_workflow_node_execute_succeeded.call_args_list
+    assert [call.kwargs['node_id'] for call in succeeded_calls] == ['start', 'aggregator', 'aggregator', 'aggregator', 'end']
+    assert succeeded_calls[-1].kwargs['outputs'] == {'result': ['a', 'b', 'c']}
+
+
+def test_run_workflow_with_malformed_edge_fails():
+    graph = {
+        'nodes': [
+            {'id': 'start', 'data': {'title': 'Start', 'type': 'start', 'variables': []}},
+        ],
+        'edges': [None],
+    }
+    workflow = MagicMock(id='1', tenant_id='1', app_id='1', type='workflow', graph_dict=graph)
+    callback = MagicMock()
+    pool = VariablePool(system_variables={}, user_inputs={}, environment_variables=[])
+
+    # Mock db.session.close()
+    db.session.close = MagicMock()
+
+    WorkflowEngineManager().run_workflow(
+        workflow=workflow,
+        user_id='1',
+        user_from=UserFrom.ACCOUNT,
+        invoke_from=InvokeFrom.DEBUGGER,
+        callbacks=[callback],
+        variable_pool=pool,
+    )
+
+    callback.on_workflow_run_failed.assert_called_once()
+    callback.on_workflow_run_succeeded.assert_not_called()